@@ -7,30 +7,34 @@ Designed as a junior analyst portfolio project (safe synthetic data).
 Run:
   pip install -r python/requirements.txt
   python python/generate_requests_and_metrics.py
+  python python/generate_requests_and_metrics.py --n 5000 --seed 7 --out /tmp/tracker
+  python python/generate_requests_and_metrics.py --sweep 240 2400 24000 --out /tmp/sweep
 """
 from __future__ import annotations
 
 from pathlib import Path
+import argparse
 import datetime as dt
-import random
 
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import matplotlib
+
+matplotlib.use("Agg")  # headless: charts are only saved to disk
+import matplotlib.pyplot as plt  # noqa: E402
 
 
 ROOT = Path(__file__).resolve().parents[1]
-RAW = ROOT / "data" / "raw"
 OUT = ROOT / "outputs"
 IMG = ROOT / "images"
 
-RAW.mkdir(parents=True, exist_ok=True)
-OUT.mkdir(parents=True, exist_ok=True)
-IMG.mkdir(parents=True, exist_ok=True)
-
 SEED = 42
-random.seed(SEED)
-np.random.seed(SEED)
+
+# request window; END doubles as "today" for backlog aging
+START = dt.date(2024, 1, 1)
+END = dt.date(2025, 12, 31)
 
 TEAMS = ["Operations","Finance","Marketing","Sales","HR","Customer Support","Training"]
 REQUEST_TYPES = ["KPI Report","Data Extract","Dashboard Update","Data Quality Issue","One-off Analysis","Automation Request","Access/Permissions"]
@@ -40,248 +44,311 @@ CHANNELS = ["Email","Teams","Jira","In person"]
 # SLA targets (business days)
 SLA_DAYS = {"Urgent": 2, "High": 5, "Medium": 10, "Low": 15}
 
+# typical completion time (business days) per priority
+BASE_COMPLETION_BDAYS = {"Urgent": 3, "High": 7, "Medium": 12, "Low": 18}
+
+# typical effort (hours) per request type
+EST_HOURS_LOC = {
+    "KPI Report": 3,
+    "Data Extract": 1.5,
+    "Dashboard Update": 4,
+    "Data Quality Issue": 2.5,
+    "One-off Analysis": 5,
+    "Automation Request": 6,
+    "Access/Permissions": 1,
+}
+
 
-def add_business_days(start_date: dt.date, days: int) -> dt.date:
-    """Adds business days (Mon–Fri) to a date."""
-    d = start_date
-    step = 1 if days >= 0 else -1
-    remaining = abs(days)
-    while remaining > 0:
-        d += dt.timedelta(days=step)
-        if d.weekday() < 5:
-            remaining -= 1
-    return d
+def _weights(w: list[float]) -> np.ndarray:
+    """Normalises sampling weights into probabilities."""
+    w = np.asarray(w, dtype=float)
+    return w / w.sum()
 
 
 def make_ids(prefix: str, n: int, width: int = 5) -> list[str]:
     return [f"{prefix}{str(i).zfill(width)}" for i in range(1, n + 1)]
 
 
-def generate_requests(n: int = 240) -> pd.DataFrame:
-    start = dt.date(2024, 1, 1)
-    end = dt.date(2025, 12, 31)
+def write_csv(df: pd.DataFrame, path: Path) -> None:
+    """Writes a frame to CSV with pyarrow's native writer (dates as YYYY-MM-DD)."""
+    # NaN/NaT become nulls here, which the writer renders as empty cells
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    for i, field in enumerate(table.schema):
+        if pa.types.is_timestamp(field.type):
+            table = table.set_column(i, field.name, table.column(i).cast(pa.date32()))
+    pa_csv.write_csv(table, path)
+
+
+def generate_requests(
+    n: int = 240, start: dt.date = START, end: dt.date = END, rng: np.random.Generator | None = None
+) -> pd.DataFrame:
+    if rng is None:
+        rng = np.random.default_rng(SEED)
     date_range_days = (end - start).days
 
     request_ids = make_ids("REQ-", n, width=5)
-    rows = []
 
-    # helps generate realistic completion probability based on age
-    for rid in request_ids:
-        req_date = start + dt.timedelta(days=int(np.random.randint(0, date_range_days + 1)))
-        team = random.choices(TEAMS, weights=[18, 14, 16, 12, 8, 18, 14], k=1)[0]
-        rtype = random.choices(REQUEST_TYPES, weights=[20, 18, 16, 14, 12, 10, 10], k=1)[0]
-        priority = random.choices(PRIORITIES, weights=[30, 45, 18, 7], k=1)[0]
-
-        due_date = add_business_days(req_date, SLA_DAYS[priority])
-
-        age_days = (end - req_date).days
-        close_prob = min(0.95, 0.25 + age_days / 500)
-
-        if random.random() < close_prob:
-            status = "Done"
-            base = {"Urgent": 3, "High": 7, "Medium": 12, "Low": 18}[priority]
-            completion_bdays = max(1, int(np.random.normal(loc=base, scale=3)))
-            completed = add_business_days(req_date, completion_bdays)
-            if completed > end:
-                completed = end
-        else:
-            status = random.choice(["Open", "In Progress"])
-            completed = None
-
-        est_hours = max(
-            0.5,
-            round(
-                np.random.normal(
-                    loc={
-                        "KPI Report": 3,
-                        "Data Extract": 1.5,
-                        "Dashboard Update": 4,
-                        "Data Quality Issue": 2.5,
-                        "One-off Analysis": 5,
-                        "Automation Request": 6,
-                        "Access/Permissions": 1,
-                    }[rtype],
-                    scale=1.2,
-                ),
-                1,
-            ),
-        )
+    # sample every column in one shot instead of row by row
+    req_dates = np.datetime64(start, "D") + rng.integers(0, date_range_days + 1, n).astype("timedelta64[D]")
+    team_codes = rng.choice(len(TEAMS), n, p=_weights([18, 14, 16, 12, 8, 18, 14]))
+    rtype_codes = rng.choice(len(REQUEST_TYPES), n, p=_weights([20, 18, 16, 14, 12, 10, 10]))
+    priority_codes = rng.choice(len(PRIORITIES), n, p=_weights([30, 45, 18, 7]))
+    channel_codes = rng.choice(len(CHANNELS), n)
 
-        act_hours = (
-            max(0.25, round(est_hours * np.random.normal(loc=1.05, scale=0.25), 1))
-            if status == "Done"
-            else np.nan
-        )
+    sla_days = np.asarray([SLA_DAYS[p] for p in PRIORITIES])[priority_codes]
 
-        rows.append(
-            {
-                "request_id": rid,
-                "request_date": req_date.isoformat(),
-                "requester_team": team,
-                "request_type": rtype,
-                "priority": priority,
-                "channel": random.choice(CHANNELS),
-                "due_date": due_date.isoformat(),
-                "status": status,
-                "completed_date": completed.isoformat() if completed else "",
-                "estimated_hours": est_hours,
-                "actual_hours": "" if pd.isna(act_hours) else act_hours,
-            }
-        )
+    # business days (Mon–Fri); weekend request dates count from the preceding Friday
+    due_dates = np.busday_offset(req_dates, sla_days, roll="backward")
 
-    return pd.DataFrame(rows)
+    # helps generate realistic completion probability based on age
+    age_days = (np.datetime64(end, "D") - req_dates).astype("int64")
+    close_prob = np.minimum(0.95, 0.25 + age_days / 500)
+    done = rng.random(n) < close_prob
+    statuses = np.where(done, "Done", rng.choice(["Open", "In Progress"], n))
+
+    base = np.asarray([BASE_COMPLETION_BDAYS[p] for p in PRIORITIES])[priority_codes]
+    completion_bdays = np.maximum(1, rng.normal(loc=base, scale=3, size=n).astype("int64"))
+    completed = np.minimum(np.busday_offset(req_dates, completion_bdays, roll="backward"), np.datetime64(end, "D"))
+
+    est_loc = np.asarray([EST_HOURS_LOC[t] for t in REQUEST_TYPES])[rtype_codes]
+    est_hours = np.maximum(0.5, np.round(rng.normal(loc=est_loc, scale=1.2, size=n), 1))
+    act_hours = np.maximum(0.25, np.round(est_hours * rng.normal(loc=1.05, scale=0.25, size=n), 1))
+
+    return pd.DataFrame(
+        {
+            "request_id": request_ids,
+            "request_date": req_dates,
+            "requester_team": pd.Categorical.from_codes(team_codes, categories=TEAMS),
+            "request_type": pd.Categorical.from_codes(rtype_codes, categories=REQUEST_TYPES),
+            "priority": pd.Categorical.from_codes(priority_codes, categories=PRIORITIES),
+            "channel": pd.Categorical.from_codes(channel_codes, categories=CHANNELS),
+            "due_date": due_dates,
+            "status": statuses,
+            "completed_date": np.where(done, completed, np.datetime64("NaT")),
+            "estimated_hours": est_hours,
+            "actual_hours": np.where(done, act_hours, np.nan),
+        }
+    )
 
 
-def enrich(df_req: pd.DataFrame) -> pd.DataFrame:
-    df = df_req.copy()
-    df["request_date"] = pd.to_datetime(df["request_date"])
-    df["due_date"] = pd.to_datetime(df["due_date"])
-    df["completed_date"] = pd.to_datetime(df["completed_date"], errors="coerce")
+def enrich(df_req: pd.DataFrame, today: dt.date = END) -> pd.DataFrame:
+    # enriches in place: the raw frame is written out before this and not reused
+    df = df_req
+
+    req = df["request_date"].to_numpy().astype("datetime64[D]")
+    due = df["due_date"].to_numpy().astype("datetime64[D]")
+    comp = df["completed_date"].to_numpy().astype("datetime64[D]")
 
     df["is_closed"] = df["status"].eq("Done")
-    df["turnaround_days_calendar"] = (df["completed_date"] - df["request_date"]).dt.days
+    is_closed = df["is_closed"].to_numpy()
+
+    turnaround = comp - req
+    df["turnaround_days_calendar"] = np.where(np.isnat(turnaround), np.nan, turnaround.astype("int64"))
 
-    today = pd.Timestamp(dt.date(2025, 12, 31))
     df["age_days_calendar"] = np.where(
-        df["is_closed"], df["turnaround_days_calendar"], (today - df["request_date"]).dt.days
+        is_closed, df["turnaround_days_calendar"], (np.datetime64(today, "D") - req).astype("int64")
     )
 
-    df["sla_target_bdays"] = df["priority"].map(SLA_DAYS)
-    df["sla_breached"] = np.where(df["is_closed"], df["completed_date"] > df["due_date"], False)
-    df["month"] = df["request_date"].dt.to_period("M").dt.to_timestamp()
+    df["sla_target_bdays"] = df["priority"].map(SLA_DAYS).astype("int64")
+    df["sla_breached"] = np.where(is_closed, comp > due, False)
+    # month start via datetime64[M] truncation (no PeriodIndex round-trip)
+    df["month"] = req.astype("datetime64[M]")
 
     return df
 
 
-def compute_outputs(df: pd.DataFrame) -> None:
-    # overall
+def compute_outputs(
+    df: pd.DataFrame, out: Path = OUT, img: Path = IMG, fig: plt.Figure | None = None
+) -> None:
+    closed_mask = df["is_closed"].to_numpy()
+    open_mask = ~closed_mask
+
+    # only carry the columns the closed-request aggregations read
+    closed = df.loc[
+        closed_mask,
+        ["request_id", "requester_team", "priority", "month", "sla_breached", "turnaround_days_calendar"],
+    ]
+
+    # overall (means are NaN when nothing is closed yet -> report 0)
     overall = pd.DataFrame(
         [
             {
                 "total_requests": len(df),
-                "closed_requests": int(df["is_closed"].sum()),
-                "open_requests": int((~df["is_closed"]).sum()),
-                "breached_requests": int(df.loc[df["is_closed"], "sla_breached"].sum()),
-                "breach_rate_closed": round(
-                    df.loc[df["is_closed"], "sla_breached"].mean() * 100, 2
-                )
-                if df["is_closed"].any()
-                else 0,
-                "avg_turnaround_days_closed": round(
-                    df.loc[df["is_closed"], "turnaround_days_calendar"].mean(), 2
-                )
-                if df["is_closed"].any()
-                else 0,
+                "closed_requests": len(closed),
+                "open_requests": len(df) - len(closed),
+                "breached_requests": int(closed["sla_breached"].sum()),
+                "breach_rate_closed": round(closed["sla_breached"].mean() * 100, 2),
+                "avg_turnaround_days_closed": round(closed["turnaround_days_calendar"].mean(), 2),
             }
         ]
-    )
+    ).fillna(0)
 
     # team metrics
     team_metrics = (
-        df[df["is_closed"]]
-        .groupby("requester_team")
+        closed.groupby("requester_team", observed=True)
         .agg(
             closed_requests=("request_id", "count"),
-            breach_rate=("sla_breached", lambda s: round(s.mean() * 100, 2)),
+            breach_rate=("sla_breached", "mean"),
             avg_turnaround_days=("turnaround_days_calendar", "mean"),
         )
         .reset_index()
     )
+    team_metrics["breach_rate"] = (team_metrics["breach_rate"] * 100).round(2)
     team_metrics["avg_turnaround_days"] = team_metrics["avg_turnaround_days"].round(2)
 
-    # backlog aging
-    open_df = df[~df["is_closed"]].copy()
-    bins = [-1, 7, 14, 30, 60, 9999]
+    # backlog aging: 2D histogram of (team, age bucket) over open requests
+    open_df = df.loc[open_mask, ["requester_team", "age_days_calendar"]]
     labels = ["0-7 days", "8-14 days", "15-30 days", "31-60 days", "60+ days"]
-    open_df["age_bucket"] = pd.cut(open_df["age_days_calendar"], bins=bins, labels=labels)
-    backlog_buckets = (
-        open_df.groupby(["requester_team", "age_bucket"])
-        .size()
-        .reset_index(name="open_requests")
+    bucket_idx = np.digitize(open_df["age_days_calendar"].to_numpy(), [8, 15, 31, 61])
+    team_idx = pd.Categorical(open_df["requester_team"], categories=TEAMS).codes
+    counts = np.bincount(team_idx * len(labels) + bucket_idx, minlength=len(TEAMS) * len(labels))
+    backlog_wide = pd.DataFrame(
+        counts.reshape(len(TEAMS), len(labels)),
+        index=pd.Index(TEAMS, name="requester_team"),
+        columns=pd.Index(labels, name="age_bucket"),
     )
 
     # breach by month
     breach_month = (
-        df[df["is_closed"]]
-        .groupby("month")
+        closed.groupby("month")
         .agg(breached=("sla_breached", "sum"), closed=("request_id", "count"))
         .reset_index()
     )
     breach_month["breach_rate"] = (breach_month["breached"] / breach_month["closed"] * 100).round(2)
 
     # write outputs
-    overall.to_csv(OUT / "sla_summary.csv", index=False)
-    team_metrics.sort_values("closed_requests", ascending=False).to_csv(
-        OUT / "team_sla_metrics.csv", index=False
-    )
-    backlog_buckets.to_csv(OUT / "backlog_age_buckets.csv", index=False)
-    breach_month.to_csv(OUT / "monthly_breach_rate.csv", index=False)
+    write_csv(overall, out / "sla_summary.csv")
+    write_csv(team_metrics.sort_values("closed_requests", ascending=False), out / "team_sla_metrics.csv")
+    write_csv(backlog_wide.stack().reset_index(name="open_requests"), out / "backlog_age_buckets.csv")
+    write_csv(breach_month, out / "monthly_breach_rate.csv")
+
+    # charts (use defaults to keep it simple; one figure reused for every chart,
+    # and across runs when the caller passes one in)
+    own_fig = fig is None
+    if own_fig:
+        fig = plt.figure()
+    fig.clear()
+    fig.set_size_inches(plt.rcParams["figure.figsize"])
+    ax = fig.add_subplot()
 
-    # charts (use defaults to keep it simple)
     # 1) breach rate line
-    fig = plt.figure()
-    plt.plot(breach_month["month"], breach_month["breach_rate"], marker="o")
-    plt.title("Monthly SLA Breach Rate (Closed Requests)")
-    plt.ylabel("Breach rate (%)")
-    plt.xlabel("Month")
-    plt.xticks(rotation=45, ha="right")
-    plt.tight_layout()
-    fig.savefig(IMG / "sla_breach_rate.png", dpi=160)
-    plt.close(fig)
+    ax.plot(breach_month["month"], breach_month["breach_rate"], marker="o")
+    ax.set_title("Monthly SLA Breach Rate (Closed Requests)")
+    ax.set_ylabel("Breach rate (%)")
+    ax.set_xlabel("Month")
+    plt.setp(ax.get_xticklabels(), rotation=45, ha="right")
+    fig.tight_layout()
+    fig.savefig(img / "sla_breach_rate.png", dpi=160)
 
     # 2) backlog by team stacked bar
-    pivot = backlog_buckets.pivot_table(
-        index="requester_team", columns="age_bucket", values="open_requests", aggfunc="sum", fill_value=0
-    )
-    ax = pivot.plot(kind="bar", stacked=True)
+    ax.clear()
+    backlog_wide.plot(kind="bar", stacked=True, ax=ax)
     ax.set_title("Open Requests by Team (Aging Buckets)")
     ax.set_ylabel("Open requests")
     ax.set_xlabel("Team")
-    plt.xticks(rotation=45, ha="right")
-    plt.tight_layout()
-    plt.gcf().savefig(IMG / "backlog_by_team.png", dpi=160)
-    plt.close("all")
+    plt.setp(ax.get_xticklabels(), rotation=45, ha="right")
+    fig.tight_layout()
+    fig.savefig(img / "backlog_by_team.png", dpi=160)
 
     # 3) avg turnaround by priority
     priority_turn = (
-        df[df["is_closed"]]
-        .groupby("priority")["turnaround_days_calendar"]
+        closed.groupby("priority", observed=True)["turnaround_days_calendar"]
         .mean()
         .reindex(PRIORITIES)
     )
-    fig = plt.figure()
-    priority_turn.plot(kind="bar")
-    plt.title("Average Turnaround (Closed Requests)")
-    plt.ylabel("Days (calendar)")
-    plt.xlabel("Priority")
-    plt.xticks(rotation=0)
-    plt.tight_layout()
-    fig.savefig(IMG / "avg_turnaround_by_priority.png", dpi=160)
-    plt.close(fig)
+    ax.clear()
+    priority_turn.plot(kind="bar", ax=ax)
+    ax.set_title("Average Turnaround (Closed Requests)")
+    ax.set_ylabel("Days (calendar)")
+    ax.set_xlabel("Priority")
+    plt.setp(ax.get_xticklabels(), rotation=0)
+    fig.tight_layout()
+    fig.savefig(img / "avg_turnaround_by_priority.png", dpi=160)
 
     # 4) simple workflow graphic (text)
-    fig = plt.figure(figsize=(8, 2.4))
-    plt.axis("off")
-    plt.text(0.02, 0.55, "Requests Log (CSV)", fontsize=12, va="center")
-    plt.text(0.30, 0.55, "→  SLA + Aging Metrics", fontsize=12, va="center")
-    plt.text(0.62, 0.55, "→  Outputs (CSV/DB)", fontsize=12, va="center")
-    plt.text(0.86, 0.55, "→  Dashboard", fontsize=12, va="center")
-    plt.title("Workflow", y=0.95)
-    plt.tight_layout()
-    fig.savefig(IMG / "workflow.png", dpi=160)
-    plt.close(fig)
+    ax.clear()
+    fig.set_size_inches(8, 2.4)
+    ax.axis("off")
+    ax.text(0.02, 0.55, "Requests Log (CSV)", fontsize=12, va="center")
+    ax.text(0.30, 0.55, "→  SLA + Aging Metrics", fontsize=12, va="center")
+    ax.text(0.62, 0.55, "→  Outputs (CSV/DB)", fontsize=12, va="center")
+    ax.text(0.86, 0.55, "→  Dashboard", fontsize=12, va="center")
+    ax.set_title("Workflow", y=0.95)
+    fig.tight_layout()
+    fig.savefig(img / "workflow.png", dpi=160)
+    if own_fig:
+        plt.close(fig)
+
+
+def run(
+    n: int,
+    root: Path,
+    start: dt.date = START,
+    end: dt.date = END,
+    rng: np.random.Generator | None = None,
+    fig: plt.Figure | None = None,
+) -> None:
+    """Generates one dataset of n requests and writes data/raw, outputs and images under root."""
+    raw, out, img = root / "data" / "raw", root / "outputs", root / "images"
+    for d in (raw, out, img):
+        d.mkdir(parents=True, exist_ok=True)
+
+    df_req = generate_requests(n=n, start=start, end=end, rng=rng)
+    write_csv(df_req, raw / "requests.csv")
+
+    df = enrich(df_req, today=end)
+    # typed + compressed; the small summary tables stay CSV for Excel
+    df.to_parquet(out / "requests_enriched.parquet", engine="pyarrow", compression="zstd", index=False)
+
+    compute_outputs(df, out=out, img=img, fig=fig)
+    print("✅ Done. Outputs written to:", out)
+    print("✅ Charts written to:", img)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate synthetic request data + SLA metrics.")
+    sizes = parser.add_mutually_exclusive_group()
+    sizes.add_argument("--n", type=int, default=240, help="number of requests (default: 240)")
+    parser.add_argument("--seed", type=int, default=SEED, help=f"random seed (default: {SEED})")
+    parser.add_argument(
+        "--start", type=dt.date.fromisoformat, default=START, help="first request date (YYYY-MM-DD)"
+    )
+    parser.add_argument(
+        "--end", type=dt.date.fromisoformat, default=END, help="last request date / as-of date (YYYY-MM-DD)"
+    )
+    parser.add_argument(
+        "--out", type=Path, default=ROOT, help="root folder for data/raw, outputs and images (default: repo root)"
+    )
+    sizes.add_argument(
+        "--sweep",
+        type=int,
+        nargs="+",
+        metavar="N",
+        help="run once per N in this process, writing each run to <out>/n<N>",
+    )
+    args = parser.parse_args(argv)
+
+    if args.start > args.end:
+        parser.error(f"--start ({args.start}) must not be after --end ({args.end})")
+    for n in args.sweep or [args.n]:
+        if n < 0:
+            parser.error(f"number of requests must be >= 0 (got {n})")
+    return args
 
 
-def main() -> None:
-    df_req = generate_requests(n=240)
-    df_req.to_csv(RAW / "requests.csv", index=False)
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    rng = np.random.default_rng(args.seed)
 
-    df = enrich(df_req)
-    df.to_csv(OUT / "requests_enriched.csv", index=False)
+    if not args.sweep:
+        run(args.n, args.out, start=args.start, end=args.end, rng=rng)
+        return
 
-    compute_outputs(df)
-    print("✅ Done. Outputs written to:", OUT)
-    print("✅ Charts written to:", IMG)
+    # one process, one generator, one figure for every run in the sweep
+    fig = plt.figure()
+    for n in args.sweep:
+        run(n, args.out / f"n{n}", start=args.start, end=args.end, rng=rng, fig=fig)
+    plt.close(fig)
 
 
 if __name__ == "__main__":